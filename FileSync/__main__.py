@@ -4,7 +4,7 @@ from os import getcwd, path
 from sys import exit
 from pathlib import Path
 from resources.strings import *
-from main import FileChecker
+from main import FileChecker, TransferScheduler
 from setup_utility import setup_settings
 
 
@@ -26,6 +26,7 @@ if __name__ == "__main__":
     parser.add_argument('--username', dest='sftp_user', default='', help='Sets the username for sftp server communication')
     parser.add_argument('--password', dest='sftp_pass', default='', help='Sets the password for sftp server communication')
     parser.add_argument('--setup', dest='setup_feature', action='store_true', default=False, help='Initializes setup mode which provides an interactive settings.ini creation utility')
+    parser.add_argument('--control-socket', dest='control_socket', default='', help='Sets a UNIX-domain socket path that accepts control commands while live scanning (sync <path>, pause, resume, flush, stats)')
     parser.add_argument('--clear-targets', dest='clear_on_start', action='store_true', default=False, help='Clears destination directories before starting synchronizations')
 
     args = parser.parse_args()
@@ -46,4 +47,24 @@ if __name__ == "__main__":
         if not path.isdir(target) and not args.use_sftp:
             print(f"Encountered a directory error in the settings.ini file. Please make sure the {P_DEST_DIR} is a valid directory.")
             exit(-1)
-    checker = FileChecker(config=config, debug=args.debug_feature, quiet=args.quiet_feature, clear_on_start=args.clear_on_start, use_sftp=args.use_sftp, sftp_user=args.sftp_user, sftp_pass=args.sftp_pass, no_live_scan=args.live_scan, batch_size=args.batch_size, hash_algo=args.hash_algorithm, benchmark=args.bench_feature, multi=args.multi_feature, scan_interval=int(args.scan_interval))
+    for rate_setting in (P_READ_LIMIT, P_WRITE_LIMIT, P_NETWORK_LIMIT):
+        try:
+            if rate_setting == P_READ_LIMIT:
+                TransferScheduler.parse_rate(config[C_MAIN_SETTINGS].get(rate_setting, ''))
+            else:
+                TransferScheduler.parse_rates(config[C_MAIN_SETTINGS].get(rate_setting, ''))
+        except ValueError:
+            print(f"Encountered a rate limit error in the settings.ini file. Please make sure the {rate_setting} is a number of bytes per second, optionally with a K, M or G suffix (ex: 512K, 10MB).")
+            exit(-1)
+        if rate_setting != P_READ_LIMIT:
+            rate_count = len(TransferScheduler.parse_rates(config[C_MAIN_SETTINGS].get(rate_setting, '')))
+            if rate_count > 1 and rate_count != len(target_paths):
+                print(f"Encountered a rate limit error in the settings.ini file. Please make sure the {rate_setting} has either a single value or one value for each of the {len(target_paths)} {P_DEST_DIR}.")
+                exit(-1)
+    try:
+        if int(config[C_MAIN_SETTINGS].get(P_TRANSFER_WORKERS, '2') or 2) <= 0:
+            raise ValueError
+    except ValueError:
+        print(f"Encountered a transfer worker error in the settings.ini file. Please make sure the {P_TRANSFER_WORKERS} is an integer value over 0.")
+        exit(-1)
+    checker = FileChecker(config=config, debug=args.debug_feature, quiet=args.quiet_feature, clear_on_start=args.clear_on_start, use_sftp=args.use_sftp, sftp_user=args.sftp_user, sftp_pass=args.sftp_pass, no_live_scan=args.live_scan, batch_size=args.batch_size, hash_algo=args.hash_algorithm, benchmark=args.bench_feature, multi=args.multi_feature, scan_interval=int(args.scan_interval), control_socket=args.control_socket)
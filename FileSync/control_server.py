@@ -0,0 +1,134 @@
+import socket
+import socketserver
+import stat
+import threading
+from os import lstat, remove, umask
+from pathlib import Path
+from resources.strings import *
+
+
+# Handles a single control socket connection, with one command per line.
+class ControlRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            command = line.decode('utf-8', errors='replace').strip()
+            if len(command) == 0:
+                continue
+            response = self.server.handle_command(command)
+            self.wfile.write(f"{response}\n".encode('utf-8'))
+            self.wfile.flush()
+
+
+# Local UNIX-domain socket that accepts commands for a running FileChecker.
+class ControlServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    # Default number of seconds the flush command waits for pending transfers.
+    FLUSH_TIMEOUT = 300
+
+    def __init__(self, socket_path, checker, debug=False):
+        self.socket_path = socket_path
+        self.checker = checker
+        self.debug = debug
+        self.remove_stale_socket()
+        # Only the user running FileSync is allowed to send commands, so the socket is created without group/other access.
+        old_umask = umask(0o177)
+        try:
+            super().__init__(self.socket_path, ControlRequestHandler)
+        finally:
+            umask(old_umask)
+        self.socket_inode = lstat(self.socket_path).st_ino
+        self.server_thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    # Removes a socket left behind by a previous run. Raises an OSError if the path is not a socket,
+    # or if another running instance is still listening on it.
+    def remove_stale_socket(self):
+        try:
+            socket_stat = lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(socket_stat.st_mode):
+            raise FileExistsError(f"Control socket path already exists and is not a socket: {self.socket_path}")
+        test_client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            test_client.connect(self.socket_path)
+        except OSError:
+            if self.debug:
+                print(f"Removing stale control socket: {self.socket_path}")
+            remove(self.socket_path)
+            return
+        finally:
+            test_client.close()
+        raise OSError(f"Control socket is already in use by another instance: {self.socket_path}")
+
+    def start(self):
+        self.server_thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        # Only removes the socket if it is still the one created by this server.
+        try:
+            socket_stat = lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if stat.S_ISSOCK(socket_stat.st_mode) and socket_stat.st_ino == self.socket_inode:
+            remove(self.socket_path)
+
+    # Resolves and runs a control command, returning the response sent back to the client.
+    def handle_command(self, command):
+        if self.debug:
+            print(f"Received control command: {command}")
+        parts = command.split(maxsplit=1)
+        action = parts[0].lower()
+        argument = parts[1] if len(parts) > 1 else ''
+        try:
+            if action == CMD_SYNC:
+                return self.sync_command(argument)
+            elif action == CMD_PAUSE:
+                self.checker.pause()
+                return "OK paused"
+            elif action == CMD_RESUME:
+                self.checker.resume()
+                return "OK resumed"
+            elif action == CMD_FLUSH:
+                return self.flush_command(argument)
+            elif action == CMD_STATS:
+                return "OK " + ' '.join(f"{key}={value}" for key, value in self.checker.stats().items())
+            elif action == CMD_HELP:
+                return f"OK commands: {CMD_SYNC} <path>, {CMD_PAUSE}, {CMD_RESUME}, {CMD_FLUSH} [timeout], {CMD_STATS}, {CMD_HELP}"
+            else:
+                return f"ERROR unknown command: {action}"
+        except Exception as e:
+            if self.debug:
+                print(f"Encountered an error while handling control command:\n{e}")
+            return f"ERROR {e}"
+
+    # Waits for the transfers pending when the command was received, with an optional timeout in seconds.
+    def flush_command(self, argument):
+        timeout = float(argument) if argument else self.FLUSH_TIMEOUT
+        if self.checker.scheduler.is_paused():
+            return "ERROR transfers are paused, resume before flushing"
+        failed_transfers = self.checker.scheduler.failed_transfers
+        if self.checker.scheduler.flush(timeout=timeout):
+            return "OK flushed"
+        if self.checker.scheduler.is_paused():
+            return "ERROR transfers were paused while flushing"
+        if self.checker.scheduler.failed_transfers != failed_transfers:
+            return f"ERROR {self.checker.scheduler.failed_transfers - failed_transfers} transfers failed while flushing"
+        return f"ERROR timed out after {timeout:g}s with {self.checker.scheduler.pending_count()} pending transfers"
+
+    # Scans a sub-directory of the source directory immediately. Relative paths are resolved from the source directory.
+    def sync_command(self, argument):
+        configured_src_dir = self.checker.config[C_MAIN_SETTINGS][P_SRC_DIR]
+        src_dir = Path(configured_src_dir).resolve()
+        sync_dir = Path(src_dir, argument).resolve()
+        if sync_dir.is_file():
+            sync_dir = sync_dir.parent
+        if sync_dir != src_dir and src_dir not in sync_dir.parents:
+            return f"ERROR path is outside of the source directory: {sync_dir.as_posix()}"
+        if not sync_dir.is_dir():
+            return f"ERROR directory does not exist: {sync_dir.as_posix()}"
+        # Scans using the configured form of the source directory, so the hash dictionary keys match the live scan.
+        scan_dir = Path(configured_src_dir, sync_dir.relative_to(src_dir)).as_posix()
+        change_detected = self.checker.sync_path(scan_dir)
+        return f"OK synced {scan_dir} changes={change_detected}"
@@ -1,11 +1,16 @@
 import shutil
 import errno
+import itertools
 import multiprocessing
+import re
+import threading
 from hashlib import sha512, sha224, sha256, sha384, sha1, md5
 from zlib import crc32, adler32
 from os import makedirs, walk, remove, listdir
 from pathlib import Path
-from time import sleep, time
+from queue import PriorityQueue
+from sys import exit
+from time import sleep, time, monotonic
 from resources.strings import *
 
 
@@ -33,8 +38,39 @@ class HashResolver:
             return None
 
 
+# Limits the throughput of a resource (disk or network) to a fixed number of bytes per second.
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity else rate
+        # Shared memory values, so the forked multi-core scan processes draw from the same bucket.
+        self.tokens = multiprocessing.Value('d', self.capacity, lock=False)
+        self.last_refill = multiprocessing.Value('d', monotonic(), lock=False)
+        self.lock = multiprocessing.Lock()
+
+    # Blocks until the given amount of bytes is allowed through the bucket. A rate of 0 or less is unlimited.
+    def consume(self, amount):
+        if self.rate <= 0:
+            return
+        while amount > 0:
+            with self.lock:
+                now = monotonic()
+                self.tokens.value = min(self.capacity, self.tokens.value + (now - self.last_refill.value) * self.rate)
+                self.last_refill.value = now
+                requested = min(amount, self.capacity)
+                if self.tokens.value >= requested:
+                    self.tokens.value -= requested
+                    amount -= requested
+                    continue
+                wait_time = (requested - self.tokens.value) / self.rate
+            sleep(wait_time)
+
+
 # Handles file copying and directory creation.
 class FileBackup:
+    # Chunk size used when copying files with a rate limit applied.
+    TRANSFER_CHUNK_SIZE = 65536
+
     def __init__(self, debug=False):
         self.debug = debug
 
@@ -68,7 +104,7 @@ class FileBackup:
                 return False
 
     # Copies files from a source file path to a destination file path, maintaining sub-folder hierarchy.
-    def copy_file(self, file_src, target_src, full_target_src, sftp_client=None):
+    def copy_file(self, file_src, target_src, full_target_src, sftp_client=None, read_limiter=None, write_limiter=None):
         if sftp_client is None:
             # Makes required sub-directories as required by the source path.
             try:
@@ -79,17 +115,24 @@ class FileBackup:
             # Copies the files with respect to the folder hierarchy.
             try:
                 shutil.copytree(file_src, full_target_src)
+                return True
             except OSError as e:
                 # If the item being copied is not a directory, copy as a file.
                 if e.errno == errno.ENOTDIR:
-                    shutil.copy(file_src, full_target_src)
+                    if read_limiter is None and write_limiter is None:
+                        shutil.copy(file_src, full_target_src)
+                    else:
+                        self.throttled_copy(file_src, full_target_src, read_limiter, write_limiter)
+                    return True
                 # Reports file read/write permission errors.
                 elif e.errno == errno.EPERM:
                     if self.debug:
                         print(f"Encountered a file permission error while copying files/directories:\n{e}")
+                    return False
                 else:
                     if self.debug:
                         print(f"Encountered an error while copying files/directories:\n{e}")
+                    return False
         else:
             try:
                 sftp_client.mkdir(target_src.as_posix())
@@ -97,19 +140,270 @@ class FileBackup:
                 if self.debug:
                     print(f"Directory already exists: {target_src.as_posix()}")
             try:
-                sftp_client.put(file_src.as_posix(), full_target_src.as_posix())
+                sftp_client.put(file_src.as_posix(), full_target_src.as_posix(),
+                                callback=self.throttle_callback(read_limiter, write_limiter))
                 if self.debug:
                     print(f'SRC: {file_src.as_posix()}')
                     print(f'DST: {full_target_src.as_posix()}')
-
+                return True
             except Exception as e:
                 if self.debug:
                     print(f"Encountered SFTP file transfer error:\n{e}")
+                return False
+
+    # Copies a single file in chunks, waiting on the given rate limiters before every read/write.
+    def throttled_copy(self, file_src, full_target_src, read_limiter=None, write_limiter=None):
+        with open(file_src, 'rb') as src_file, open(full_target_src, 'wb') as dst_file:
+            buffer = src_file.read(self.TRANSFER_CHUNK_SIZE)
+            while len(buffer) > 0:
+                if read_limiter is not None:
+                    read_limiter.consume(len(buffer))
+                if write_limiter is not None:
+                    write_limiter.consume(len(buffer))
+                dst_file.write(buffer)
+                buffer = src_file.read(self.TRANSFER_CHUNK_SIZE)
+        shutil.copymode(file_src, full_target_src)
+
+    # Creates a paramiko progress callback that throttles SFTP uploads with the given rate limiters.
+    @staticmethod
+    def throttle_callback(read_limiter=None, write_limiter=None):
+        if read_limiter is None and write_limiter is None:
+            return None
+        progress = {'transferred': 0}
+
+        def callback(transferred, total):
+            chunk = transferred - progress['transferred']
+            progress['transferred'] = transferred
+            if read_limiter is not None:
+                read_limiter.consume(chunk)
+            if write_limiter is not None:
+                write_limiter.consume(chunk)
+        return callback
+
+
+# Queues changed files by priority and copies them to the destination directories on background worker threads.
+# Small and recently modified files are transferred first, so they are not held up behind large files.
+class TransferScheduler:
+    # Multipliers for the unit suffixes supported in rate limit settings.
+    RATE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+    def __init__(self, copier, targets, sftp_transport=None, read_limit=0, write_limits=None, network_limits=None, workers=2, debug=False):
+        self.copier = copier
+        self.sftp_transport = sftp_transport
+        self.debug = debug
+        self.queue = PriorityQueue()
+        self.counter = itertools.count()
+        # Latest queued sequence number for each destination file, used to drop superseded transfers.
+        self.pending = {}
+        # Sequence numbers that have been queued, but not transferred or dropped yet.
+        self.outstanding = set()
+        # Destination files currently being written, and the next transfer held back for each of them.
+        self.in_flight = set()
+        self.deferred = {}
+        self.pending_lock = threading.Condition()
+        self.completed_transfers = 0
+        self.completed_bytes = 0
+        self.failed_transfers = 0
+        # Workers only start transfers while this event is set.
+        self.active = threading.Event()
+        self.active.set()
+        self.stopping = False
+
+        # The source disk is shared by every destination, while each destination has its own write/network limit.
+        self.read_limiter = TokenBucket(read_limit) if read_limit > 0 else None
+        if sftp_transport is None:
+            limits = self.resolve_limits(write_limits, len(targets))
+        else:
+            limits = self.resolve_limits(network_limits, len(targets))
+        self.dest_limiters = {}
+        for target, limit in zip(targets, limits):
+            self.dest_limiters[target] = TokenBucket(limit) if limit > 0 else None
+
+        self.live_workers = max(1, workers)
+        for _ in range(self.live_workers):
+            worker = threading.Thread(target=self.transfer_worker, daemon=True)
+            worker.start()
+
+    # Parses a rate limit in bytes per second, with an optional K/M/G unit suffix (ex: 512K, 10 MB, 1GiB/s).
+    # A blank value is unlimited. Raises a ValueError if the rate limit is invalid.
+    @staticmethod
+    def parse_rate(value):
+        if len(value.strip()) == 0:
+            return 0
+        match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?)(?:I?B)?(?:/S)?\s*', value.upper())
+        if match is None:
+            raise ValueError(f"Invalid rate limit: {value}")
+        return int(float(match.group(1)) * TransferScheduler.RATE_UNITS[match.group(2)])
+
+    # Parses a comma separated list of rate limits. A blank value is an empty list, but blank list entries are invalid.
+    @staticmethod
+    def parse_rates(value):
+        if len(value.strip()) == 0:
+            return []
+        rates = value.split(',')
+        if any(len(x.strip()) == 0 for x in rates):
+            raise ValueError(f"Invalid rate limit list: {value}")
+        return [TransferScheduler.parse_rate(x) for x in rates]
+
+    # Resolves a list of per-destination rate limits. A single value is applied to every destination.
+    # Raises a ValueError if the number of rate limits doesn't match the number of destinations.
+    @staticmethod
+    def resolve_limits(limits, target_count):
+        if not limits:
+            return [0] * target_count
+        if len(limits) == 1:
+            return limits * target_count
+        if len(limits) != target_count:
+            raise ValueError(f"Expected 1 or {target_count} rate limits, got {len(limits)}")
+        return limits
+
+    # Files are ordered by their size class (powers of 2), then by the most recent modification time.
+    @staticmethod
+    def transfer_priority(file_src):
+        try:
+            file_stat = file_src.stat()
+        except OSError:
+            return 0, 0
+        return file_stat.st_size.bit_length(), -file_stat.st_mtime
+
+    # Adds a file transfer to the queue. A newer transfer to the same destination file replaces a pending one.
+    def enqueue(self, file_src, target, target_src, full_target_src):
+        sequence = next(self.counter)
+        with self.pending_lock:
+            self.pending[full_target_src.as_posix()] = sequence
+            self.outstanding.add(sequence)
+        self.queue.put((self.transfer_priority(file_src), sequence, (file_src, target, target_src, full_target_src)))
+
+    # Blocks until the file transfers queued before this call have completed. Returns False if the timeout expires,
+    # the scheduler is paused, no workers are running, or any transfer fails while waiting.
+    def flush(self, timeout=None):
+        with self.pending_lock:
+            waiting = set(self.outstanding)
+            failed_transfers = self.failed_transfers
+            self.pending_lock.wait_for(
+                lambda: self.is_paused() or self.live_workers == 0 or not (waiting & self.outstanding), timeout
+            )
+            return not (waiting & self.outstanding) and self.failed_transfers == failed_transfers
+
+    # Stops workers from starting new transfers. Transfers already in flight are completed.
+    def pause(self):
+        with self.pending_lock:
+            self.active.clear()
+            self.pending_lock.notify_all()
+
+    def resume(self):
+        self.active.set()
+
+    # Stops the worker threads. Transfers already in flight are completed, queued transfers are not started.
+    def stop(self):
+        self.stopping = True
+        for _ in range(self.live_workers):
+            self.queue.put(((-1,), next(self.counter), None))
+        self.active.set()
+
+    def is_paused(self):
+        return not self.active.is_set()
+
+    def pending_count(self):
+        with self.pending_lock:
+            return len(self.outstanding)
+
+    # Marks a queued transfer as finished, whether it was transferred or dropped.
+    def finish_transfer(self, sequence):
+        with self.pending_lock:
+            self.outstanding.discard(sequence)
+            self.pending_lock.notify_all()
+
+    # Marks a worker thread as stopped, so flushes don't wait on transfers that will never run.
+    def worker_stopped(self):
+        with self.pending_lock:
+            self.live_workers -= 1
+            self.pending_lock.notify_all()
+
+    def transfer_worker(self):
+        # Each worker uses its own SFTP channel on the shared transport, so uploads can run concurrently.
+        sftp_client = None
+        if self.sftp_transport is not None:
+            try:
+                import paramiko
+                sftp_client = paramiko.SFTPClient.from_transport(self.sftp_transport)
+            except Exception as e:
+                print(f"Encountered an error while opening an SFTP channel for a transfer worker:\n{e}")
+                self.worker_stopped()
+                return
+        try:
+            self.process_transfers(sftp_client)
+        finally:
+            if sftp_client is not None:
+                sftp_client.close()
+            self.worker_stopped()
+
+    def process_transfers(self, sftp_client):
+        while True:
+            item = self.queue.get()
+            self.active.wait()
+            if self.stopping:
+                return
+            while item is not None:
+                priority, sequence, transfer = item
+                full_target = transfer[3].as_posix()
+                with self.pending_lock:
+                    if self.pending.get(full_target) != sequence:
+                        if self.debug:
+                            print(f"Skipping superseded transfer: {full_target}")
+                        self.outstanding.discard(sequence)
+                        self.pending_lock.notify_all()
+                        break
+                    # Holds the transfer back until the current copy to the same destination file is finished.
+                    if full_target in self.in_flight:
+                        superseded = self.deferred.get(full_target)
+                        if superseded is not None:
+                            self.outstanding.discard(superseded[1])
+                            self.pending_lock.notify_all()
+                        self.deferred[full_target] = item
+                        break
+                    self.in_flight.add(full_target)
+                self.run_transfer(sequence, transfer, sftp_client)
+                with self.pending_lock:
+                    self.in_flight.discard(full_target)
+                    item = self.deferred.pop(full_target, None)
+                if item is not None:
+                    self.active.wait()
+                    if self.stopping:
+                        return
+
+    def run_transfer(self, sequence, transfer, sftp_client):
+        file_src, target, target_src, full_target_src = transfer
+        transferred = False
+        try:
+            transferred = self.transfer_file(file_src, target, target_src, full_target_src, sftp_client)
+        except Exception as e:
+            if self.debug:
+                print(f"Encountered an error while transferring files:\n{e}")
+        try:
+            with self.pending_lock:
+                if self.pending.get(full_target_src.as_posix()) == sequence:
+                    del self.pending[full_target_src.as_posix()]
+                if transferred:
+                    self.completed_transfers += 1
+                    self.completed_bytes += file_src.stat().st_size
+                else:
+                    self.failed_transfers += 1
+        except OSError as e:
+            if self.debug:
+                print(f"Encountered an error while reading the transferred file size:\n{e}")
+        finally:
+            self.finish_transfer(sequence)
+
+    # Returns True if the file was copied to the destination.
+    def transfer_file(self, file_src, target, target_src, full_target_src, sftp_client=None):
+        return self.copier.copy_file(file_src, target_src, full_target_src, sftp_client=sftp_client,
+                              read_limiter=self.read_limiter, write_limiter=self.dest_limiters.get(target))
 
 
 # Scans the source directory for changes (by checksum) and syncs files to destination directories.
 class FileChecker:
-    def __init__(self, config, multi, no_live_scan, batch_size, hash_algo, benchmark, scan_interval, debug=False, quiet=False, clear_on_start=False, use_sftp=False, sftp_pass='', sftp_user=''):
+    def __init__(self, config, multi, no_live_scan, batch_size, hash_algo, benchmark, scan_interval, debug=False, quiet=False, clear_on_start=False, use_sftp=False, sftp_pass='', sftp_user='', control_socket=''):
         self.config = config
         self.debug = debug
         self.no_live_scan = no_live_scan
@@ -144,6 +438,23 @@ class FileChecker:
         self.hash_resolver = HashResolver(debug=self.debug)
         self.copier = FileBackup(debug=self.debug)
         self.hash_dict = {}
+        # Rate limits are in bytes per second (0 - unlimited), with optional comma separated per-destination values.
+        main_settings = self.config[C_MAIN_SETTINGS]
+        self.scheduler = TransferScheduler(
+            self.copier,
+            targets=[x.strip() for x in main_settings[P_DEST_DIR].split(',')],
+            sftp_transport=self.sftp_transport if self.use_sftp else None,
+            read_limit=TransferScheduler.parse_rate(main_settings.get(P_READ_LIMIT, '')),
+            write_limits=TransferScheduler.parse_rates(main_settings.get(P_WRITE_LIMIT, '')),
+            network_limits=TransferScheduler.parse_rates(main_settings.get(P_NETWORK_LIMIT, '')),
+            workers=int(main_settings.get(P_TRANSFER_WORKERS, '2') or 2),
+            debug=self.debug
+        )
+        # Guards the hash dictionary, so scans requested through the control socket don't overlap the live scan.
+        self.scan_lock = threading.Lock()
+        self.paused = False
+        self.scan_count = 0
+        self.last_scan_duration = 0.0
 
         if clear_on_start:
             target_paths = [x.strip() for x in self.config[C_MAIN_SETTINGS][P_DEST_DIR].split(',')]
@@ -155,7 +466,61 @@ class FileChecker:
                     for d in dirs:
                         shutil.rmtree(path.join(root, d))
 
-        self.live_scan()
+        self.control_server = None
+        if control_socket and not self.no_live_scan:
+            from control_server import ControlServer
+            try:
+                self.control_server = ControlServer(control_socket, self, debug=self.debug)
+            except OSError as e:
+                print(f"Encountered an error while creating the control socket:\n{e}")
+                self.shutdown()
+                exit(-1)
+            self.control_server.start()
+            if not self.quiet:
+                print(f"Control socket listening on: {control_socket}")
+
+        try:
+            self.live_scan()
+        finally:
+            self.shutdown()
+
+    # Stops the control socket and transfer workers, and closes the SFTP connection.
+    def shutdown(self):
+        if self.control_server is not None:
+            self.control_server.stop()
+            self.control_server = None
+        self.scheduler.stop()
+        if self.use_sftp:
+            self.sftp_client.close()
+            self.sftp_transport.close()
+
+    # Pauses the live scan and any queued file transfers.
+    def pause(self):
+        self.paused = True
+        self.scheduler.pause()
+
+    def resume(self):
+        self.paused = False
+        self.scheduler.resume()
+
+    # Immediately scans a sub-directory of the source directory, outside of the regular scan interval.
+    def sync_path(self, sub_dir) -> bool:
+        with self.scan_lock:
+            if self.multi:
+                return self.scan_directory_multi(src_dir=sub_dir)
+            return self.scan_directory_single(src_dir=sub_dir)
+
+    def stats(self):
+        return {
+            'paused': self.paused,
+            'scans': self.scan_count,
+            'last_scan_duration': f"{self.last_scan_duration:.2f}s",
+            'tracked_files': len(self.hash_dict),
+            'pending_transfers': self.scheduler.pending_count(),
+            'completed_transfers': self.scheduler.completed_transfers,
+            'completed_bytes': self.scheduler.completed_bytes,
+            'failed_transfers': self.scheduler.failed_transfers,
+        }
 
     def live_scan(self):
         if not self.quiet:
@@ -163,31 +528,46 @@ class FileChecker:
         if self.multi:
             print("Initializing as a multi-core process...")
         while True:
+            if self.scheduler.live_workers == 0:
+                print("Encountered an error with the file transfer workers. No transfer workers are running, stopping synchronization.")
+                exit(-1)
+            if self.paused:
+                sleep(self.scan_interval)
+                continue
             start_time = time()
             if not self.quiet:
                 print("Starting directory scan...")
-            if self.multi:
-                if self.scan_directory_multi():
-                    if self.debug:
-                        print(f"File hash dictionary:\n{self.hash_dict}")
-                else:
-                    if self.debug:
-                        print('...')
-            else:
-                if self.scan_directory_single():
-                    if self.debug:
-                        print(f"File hash dictionary:\n{self.hash_dict}")
+            with self.scan_lock:
+                if self.multi:
+                    if self.scan_directory_multi():
+                        if self.debug:
+                            print(f"File hash dictionary:\n{self.hash_dict}")
+                    else:
+                        if self.debug:
+                            print('...')
                 else:
-                    if self.debug:
-                        print('...')
+                    if self.scan_directory_single():
+                        if self.debug:
+                            print(f"File hash dictionary:\n{self.hash_dict}")
+                    else:
+                        if self.debug:
+                            print('...')
             end_time = time() - start_time
+            self.scan_count += 1
+            self.last_scan_duration = end_time
             if self.benchmark:
                 print(f"Directory Scan Benchmark: {end_time:.2f}s")
                 print("...")
-            if not self.quiet:
-                print("Synchronization Complete.")
             if self.no_live_scan:
+                # Waits for queued transfers to complete before exiting on single synchronizations.
+                if not self.scheduler.flush():
+                    print(f"Encountered an error while transferring files: {self.scheduler.failed_transfers} failed, {self.scheduler.pending_count()} not transferred.")
+                    exit(-1)
+                if not self.quiet:
+                    print("Synchronization Complete.")
                 return
+            if not self.quiet:
+                print("Synchronization Complete.")
             sleep(self.scan_interval)
 
     def delete_missing_files(self, dir_path, file_names):
@@ -227,9 +607,16 @@ class FileChecker:
                 for target in target_paths:
                     target_path = Path(target, parent_dir)
                     full_target = Path(target, Path(parent_dir, file))
-                    self.copier.copy_file(Path(dir_path, file), target_path, full_target, sftp_client=self.sftp_client)
+                    self.scheduler.enqueue(Path(dir_path, file), target, target_path, full_target)
         return change_detected
 
+    # Reads the next buffer of a source file for hashing, limited by the source disk read rate limit.
+    def read_buffer(self, cur_file):
+        buffer = cur_file.read(int(self.config[C_MAIN_SETTINGS][P_FILE_BUFFER]))
+        if self.scheduler.read_limiter is not None:
+            self.scheduler.read_limiter.consume(len(buffer))
+        return buffer
+
     def check_file_multi(self, file, file_hashes, debug) -> bool:
         self.hasher = HashResolver.hash_classify(self.hash)
         use_crc32 = False
@@ -239,7 +626,7 @@ class FileChecker:
         if self.hash == H_ADLER_32:
             use_adler32 = True
         with open(file, 'rb') as cur_file:
-            buffer = cur_file.read(int(self.config[C_MAIN_SETTINGS][P_FILE_BUFFER]))
+            buffer = self.read_buffer(cur_file)
             try:
                 if self.hasher is not None:
                     if not use_crc32 and not use_adler32:
@@ -256,7 +643,7 @@ class FileChecker:
                 return False
 
             while len(buffer) > 0:
-                buffer = cur_file.read(int(self.config[C_MAIN_SETTINGS][P_FILE_BUFFER]))
+                buffer = self.read_buffer(cur_file)
                 try:
                     if self.hasher is not None:
                         if not use_crc32 and not use_adler32:
@@ -299,7 +686,7 @@ class FileChecker:
         if self.hash == H_ADLER_32:
             use_adler32 = True
         with open(file, 'rb') as cur_file:
-            buffer = cur_file.read(int(self.config[C_MAIN_SETTINGS][P_FILE_BUFFER]))
+            buffer = self.read_buffer(cur_file)
             try:
                 if self.hasher is not None:
                     if not use_crc32 and not use_adler32:
@@ -316,7 +703,7 @@ class FileChecker:
                 return False
 
             while len(buffer) > 0:
-                buffer = cur_file.read(int(self.config[C_MAIN_SETTINGS][P_FILE_BUFFER]))
+                buffer = self.read_buffer(cur_file)
                 try:
                     if self.hasher is not None:
                         if not use_crc32 and not use_adler32:
@@ -350,7 +737,8 @@ class FileChecker:
         del self.hasher
         return False
 
-    def file_worker(self, dir_path, batch, ignore_file_list, proc_num, return_dict, file_hashes, debug):
+    # Changed files are reported back to the parent process, which queues them on the transfer scheduler.
+    def file_worker(self, dir_path, batch, ignore_file_list, proc_num, return_dict, file_hashes, changed_files, debug):
         change_detected = False
         for i, file in enumerate(batch):
             if file in ignore_file_list:
@@ -359,18 +747,10 @@ class FileChecker:
                 continue
             if self.check_file_multi(Path(dir_path, file), file_hashes, debug):
                 change_detected = True
-                parent_dir = dir_path.rsplit('/', 1)
-                if len(parent_dir) == 0:
-                    parent_dir = dir_path.rsplit('\\', 1)
-                parent_dir = parent_dir[1]
-                target_paths = ([x.strip() for x in self.config[C_MAIN_SETTINGS][P_DEST_DIR].split(',')])
-                for target in target_paths:
-                    target_path = Path(target, parent_dir)
-                    full_target = Path(target, Path(parent_dir, file))
-                    self.copier.copy_file(Path(dir_path, file), target_path, full_target, sftp_client=self.sftp_client)
+                changed_files.append((dir_path, file))
         return_dict[proc_num] = change_detected
 
-    def scan_directory_multi(self) -> bool:
+    def scan_directory_multi(self, src_dir=None) -> bool:
         change_detected = False
         jobs = []
         batch_groups = []
@@ -379,9 +759,11 @@ class FileChecker:
         job_manager = multiprocessing.Manager()
         return_dict = job_manager.dict()
         file_hashes = job_manager.dict()
+        changed_files = job_manager.list()
         ignore_dir_list = ([x.strip() for x in self.config[C_MAIN_SETTINGS][P_DIR_IGNORE].split(',')])
         ignore_file_list = ([x.strip() for x in self.config[C_MAIN_SETTINGS][P_FILE_IGNORE].split(',')])
-        src_dir = self.config[C_MAIN_SETTINGS][P_SRC_DIR]
+        if src_dir is None:
+            src_dir = self.config[C_MAIN_SETTINGS][P_SRC_DIR]
         for file_hash in self.hash_dict.keys():
             file_hashes[file_hash] = self.hash_dict[file_hash]
         for (dir_path, dir_names, file_names) in walk(src_dir):
@@ -411,7 +793,7 @@ class FileChecker:
             for batch_item in batch_groups:
                 process = multiprocessing.Process(
                     target=self.file_worker,
-                    args=(dir_path, batch_item, ignore_file_list, len(jobs) + 1, return_dict, file_hashes, self.debug)
+                    args=(dir_path, batch_item, ignore_file_list, len(jobs) + 1, return_dict, file_hashes, changed_files, self.debug)
                 )
                 jobs.append(process)
                 process.start()
@@ -424,6 +806,16 @@ class FileChecker:
                 print(f"Batch Scan Benchmark: {end_time:.2f}s")
         for job in jobs:
             job.join()
+        target_paths = ([x.strip() for x in self.config[C_MAIN_SETTINGS][P_DEST_DIR].split(',')])
+        for dir_path, file in list(changed_files):
+            parent_dir = dir_path.rsplit('/', 1)
+            if len(parent_dir) == 0:
+                parent_dir = dir_path.rsplit('\\', 1)
+            parent_dir = parent_dir[1]
+            for target in target_paths:
+                target_path = Path(target, parent_dir)
+                full_target = Path(target, Path(parent_dir, file))
+                self.scheduler.enqueue(Path(dir_path, file), target, target_path, full_target)
         del jobs, job_manager
         self.hash_dict = file_hashes
 
@@ -431,10 +823,11 @@ class FileChecker:
             change_detected = True
         return change_detected
 
-    def scan_directory_single(self) -> bool:
+    def scan_directory_single(self, src_dir=None) -> bool:
         change_detected = False
         ignore_dir_list = ([x.strip() for x in self.config[C_MAIN_SETTINGS][P_DIR_IGNORE].split(',')])
-        src_dir = self.config[C_MAIN_SETTINGS][P_SRC_DIR]
+        if src_dir is None:
+            src_dir = self.config[C_MAIN_SETTINGS][P_SRC_DIR]
         for (dir_path, dir_names, file_names) in walk(src_dir, topdown=False):
             print(f'DIR_NAMES: {dir_names}')
             if dir_path.split('\\')[-1] in ignore_dir_list:
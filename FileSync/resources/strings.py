@@ -11,6 +11,17 @@ P_BATCH_SIZE = 'BatchProcessingGroupSize'
 P_FILE_BUFFER = 'FileReadBuffer'
 P_SERVER_IP = 'SFTPServerIP'
 P_SERVER_PORT = 'SFTPServerPort'
+P_READ_LIMIT = 'ReadRateLimit'
+P_WRITE_LIMIT = 'WriteRateLimit'
+P_NETWORK_LIMIT = 'NetworkRateLimit'
+P_TRANSFER_WORKERS = 'TransferWorkers'
+# CONTROL SOCKET COMMANDS
+CMD_SYNC = 'sync'
+CMD_PAUSE = 'pause'
+CMD_RESUME = 'resume'
+CMD_FLUSH = 'flush'
+CMD_STATS = 'stats'
+CMD_HELP = 'help'
 # SUPPORTED HASHES
 H_SHA_256 = 'sha256'
 H_SHA_224 = 'sha224'
@@ -85,6 +85,30 @@ def file_buffer_setup():
         return file_buffer_setup()
 
 
+def rate_limit_setup(limit_name):
+    try:
+        rate_limit_prompt = int(input(f'[Optional] Please enter a {limit_name} rate limit in bytes per second, or "-1" for unlimited: [Default - unlimited]\n'))
+        if rate_limit_prompt <= 0:
+            print(f"Using default parameters for {limit_name} rate limit: unlimited")
+            return 0
+        return rate_limit_prompt
+    except ValueError:
+        print(f'The {limit_name} rate limit can only be an integer value over 0.')
+        return rate_limit_setup(limit_name)
+
+
+def transfer_workers_setup():
+    try:
+        workers_prompt = int(input('[Optional] Please enter the number of concurrent file transfers, or "-1" to use the default: [Default - 2]\n'))
+        if workers_prompt <= 0:
+            print("Using default parameters for concurrent file transfers: 2")
+            return 2
+        return workers_prompt
+    except ValueError:
+        print('The number of concurrent file transfers can only be an integer value over 0.')
+        return transfer_workers_setup()
+
+
 def use_sftp_setup():
     use_sftp_prompt = input('[Optional] Do you want to use SFTP for networked directories? [Y/N]\n').lower()
     while use_sftp_prompt != 'y' and use_sftp_prompt != 'n':
@@ -121,14 +145,19 @@ def setup_settings():
     destination_dirs = destination_dirs_setup()
     batch_proc_size = batch_size_setup()
     file_read_buffer_size = file_buffer_setup()
+    read_rate_limit = rate_limit_setup('source disk read')
+    write_rate_limit = rate_limit_setup('destination disk write')
+    transfer_workers = transfer_workers_setup()
 
     use_sftp = use_sftp_setup()
     if use_sftp:
         sftp_ip = sftp_ip_setup()
         sftp_port = sftp_port_setup()
+        network_rate_limit = rate_limit_setup('SFTP upload')
     else:
         sftp_ip = '127.0.0.1'
         sftp_port = 22
+        network_rate_limit = 0
     with open(Path(getcwd(), 'settings.ini'), 'w') as settings:
         settings.write(
             "[Main_Settings]\n"
@@ -148,6 +177,14 @@ def setup_settings():
             f"SFTPServerIP = {sftp_ip}\n"
             "; SFTP Server Port\n"
             f"SFTPServerPort = {sftp_port}\n"
+            "; Source disk read rate limit for hashing and transfers in bytes per second (0 - unlimited, supports K/M/G suffixes)\n"
+            f"ReadRateLimit = {read_rate_limit}\n"
+            "; Destination disk write rate limit in bytes per second (0 - unlimited, supports K/M/G suffixes, optionally comma separated per destination directory)\n"
+            f"WriteRateLimit = {write_rate_limit}\n"
+            "; SFTP upload rate limit in bytes per second (0 - unlimited, supports K/M/G suffixes, optionally comma separated per destination directory)\n"
+            f"NetworkRateLimit = {network_rate_limit}\n"
+            "; Number of concurrent file transfers\n"
+            f"TransferWorkers = {transfer_workers}\n"
         )
         print("settings.ini file creation complete!")
 